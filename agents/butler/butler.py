@@ -2,14 +2,25 @@
 from dotenv import load_dotenv
 load_dotenv('agents/butler/.env')
 
+import asyncio
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
 import sys
 import os
+from typing import AsyncIterator, Dict, List, Optional
 
 # Add parent directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from shared.database import Database
-from shared.claude_client import ClaudeClient
+from shared.adatabase import AsyncDatabase, close_pool
+from shared.claude_client import ClaudeClient, close_clients, warm_clients
+from shared import fast_exit
+from shared.llm_cache import InMemoryLRU
+
+logger = logging.getLogger(__name__)
 
 class ButlerAgent:
     """Personal assistant agent."""
@@ -22,7 +33,20 @@ class ButlerAgent:
             tenant_id: Customer identifier for multi-tenancy
         """
         self.tenant_id = tenant_id
-        self.claude = ClaudeClient()
+        self.claude = ClaudeClient(tenant_id=tenant_id)
+        # Conversation so far; resent each turn so the prefix is prompt-cached
+        self.history: List[Dict[str, str]] = []
+        # Upper bound on messages kept; older turns beyond the client's
+        # compaction window only cost memory
+        self.max_history = int(os.getenv('BUTLER_MAX_HISTORY', '100'))
+        # Recent responses for this tenant only; never shared across agents.
+        # Opt-in, and entries expire so time-dependent answers don't go stale.
+        self._cache = None
+        self._cache_ttl = int(os.getenv('BUTLER_CACHE_TTL', '3600'))
+        if os.getenv('BUTLER_CACHE_ENABLED', '').lower() in ('1', 'true', 'yes'):
+            self._cache = InMemoryLRU(
+                max_entries=int(os.getenv('BUTLER_CACHE_SIZE', '256'))
+            )
         self.system_prompt = """You are Butler, a helpful personal assistant.
         
 You help with:
@@ -33,36 +57,80 @@ You help with:
 
 Be concise, professional, and proactive."""
     
-    def run_health_check(self):
+    async def aclose(self):
+        """Release shared connections held by the running event loop."""
+        await close_clients()
+        await close_pool()
+    
+    async def run_health_check(self):
         """Verify database and API connectivity."""
-        print("🔍 Running Butler health check...")
+        logger.info("Running Butler health check")
         
         # Test database
         try:
-            with Database(self.tenant_id) as db:
-                result = db.execute("SELECT version()")
-                print(f"✅ Database: {result[0]['version'][:50]}...")
+            async with AsyncDatabase(self.tenant_id) as db:
+                version = await db.ping()
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Database: %s...", version[:50])
         except Exception as e:
-            print(f"❌ Database check failed: {e}")
+            logger.error("Database check failed: %s", e)
             return False
         
-        # Test Claude API
+        # Test Claude API; a cached reply would mask an outage
         try:
-            response = self.claude.chat(
+            response = await self.claude.achat(
                 "Say 'Butler online' in 3 words or less",
-                system=self.system_prompt
+                system=self.system_prompt,
+                use_cache=False
             )
-            print(f"✅ Claude API: {response}")
+            logger.info("Claude API: %s", response)
         except Exception as e:
-            print(f"❌ Claude API check failed: {e}")
+            logger.error("Claude API check failed: %s", e)
             return False
         
-        print("✅ All systems operational!")
+        logger.info("All systems operational")
         return True
     
-    def process_request(self, user_input: str) -> str:
+    def _fast_reply(self, user_input: str) -> Optional[str]:
+        """Answer trivial or disallowed input locally, or None if Claude is needed."""
+        # Canned replies only open a conversation; later turns may be answers
+        # to Butler's own questions, so only refusals apply there
+        route = fast_exit.classify(user_input, allow_direct=not self.history)
+        if route == "direct":
+            return fast_exit.direct_response(user_input)
+        if route == "reject":
+            return fast_exit.REJECT_MESSAGE
+        return None
+    
+    def _remember(self, user_turn: Dict[str, str], response: str):
+        """Append a completed turn, dropping the oldest turns past the cap."""
+        self.history += [user_turn, {"role": "assistant", "content": response}]
+        excess = len(self.history) - self.max_history
+        if excess > 0:
+            # Drop whole user/assistant pairs so history starts with a user turn
+            del self.history[:excess + excess % 2]
+    
+    def _cache_key(self, user_input: str) -> str:
+        """Key a turn by tenant, system prompt and the conversation leading to it."""
+        context = json.dumps(self.history) if self.history else ""
+        return hashlib.sha256(
+            "|".join([self.tenant_id, self.system_prompt, context, user_input]).encode()
+        ).hexdigest()
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return a live cached response, if the cache is enabled."""
+        if self._cache is None:
+            return None
+        return self._cache.get(key)
+    
+    def _cache_put(self, key: str, response: str):
+        """Store a response, if the cache is enabled."""
+        if self._cache is not None:
+            self._cache.set(key, response, self._cache_ttl)
+    
+    async def process_request(self, user_input: str) -> str:
         """
-        Process a user request.
+        Process a user request as the next turn of the conversation.
         
         Args:
             user_input: The user's message/request
@@ -70,30 +138,199 @@ Be concise, professional, and proactive."""
         Returns:
             Butler's response
         """
-        try:
-            response = self.claude.chat(user_input, system=self.system_prompt)
+        reply = self._fast_reply(user_input)
+        if reply is not None:
+            return reply
+        
+        user_turn = {"role": "user", "content": user_input}
+        key = self._cache_key(user_input)
+        response = self._cache_get(key)
+        if response is not None:
+            self._remember(user_turn, response)
             return response
+        
+        try:
+            if self.history:
+                response = await self.claude.asend_message(
+                    self.history + [user_turn],
+                    system=self.system_prompt
+                )
+            else:
+                # Opening turns have no context, so they can use the semantic cache
+                response = await self.claude.achat(
+                    user_input,
+                    system=self.system_prompt
+                )
             
         except Exception as e:
             return f"❌ Error processing request: {e}"
+        
+        self._cache_put(key, response)
+        self._remember(user_turn, response)
+        return response
+    
+    async def stream_request(self, user_input: str) -> AsyncIterator[str]:
+        """
+        Process a user request, yielding the response as it streams in.
+        
+        Args:
+            user_input: The user's message/request
+            
+        Yields:
+            Fragments of Butler's response
+        """
+        reply = self._fast_reply(user_input)
+        if reply is not None:
+            yield reply
+            return
+        
+        user_turn = {"role": "user", "content": user_input}
+        key = self._cache_key(user_input)
+        response = self._cache_get(key)
+        if response is not None:
+            self._remember(user_turn, response)
+            yield response
+            return
+        
+        if self.history:
+            stream = self.claude.astream_message(
+                self.history + [user_turn],
+                system=self.system_prompt
+            )
+        else:
+            stream = self.claude.astream_chat(user_input, system=self.system_prompt)
+        
+        parts = []
+        async for token in stream:
+            parts.append(token)
+            yield token
+        
+        response = "".join(parts)
+        self._cache_put(key, response)
+        self._remember(user_turn, response)
     
-    def interactive_mode(self):
+    async def _prefetch(self, partial_input: str):
+        """Warm the semantic cache for what the user is typing."""
+        text = partial_input.strip()
+        if text and not self.history:
+            await asyncio.to_thread(
+                self.claude.semantic_cache.prefetch, text, self.system_prompt
+            )
+    
+    async def interactive_mode(self):
         """Run Butler in interactive chat mode."""
+        from prompt_toolkit import PromptSession
+        
         print("\n🤵 Butler Agent - Interactive Mode")
-        print("Type 'quit' to exit\n")
+        print("Type 'quit' to exit, '/reset' to start a new conversation\n")
+        
+        # Build the Bedrock client while the user types the first message;
+        # the reference keeps the task from being garbage collected
+        warm_task = asyncio.ensure_future(warm_clients(self.claude.region))
+        session = PromptSession()
+        loop = asyncio.get_running_loop()
+        prefetch_timer = None
+        prefetch_task = None
+        
+        def on_prefetch_done(task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.warning("Semantic cache prefetch failed: %s", task.exception())
+        
+        def start_prefetch(text):
+            # The embedding runs in a thread that can't be cancelled, so
+            # never start another while one is still in flight
+            nonlocal prefetch_task
+            if prefetch_task is not None and not prefetch_task.done():
+                return
+            prefetch_task = asyncio.ensure_future(self._prefetch(text))
+            prefetch_task.add_done_callback(on_prefetch_done)
+        
+        def on_text_changed(buffer):
+            # Look up the partial input once typing pauses (debounce)
+            nonlocal prefetch_timer
+            if prefetch_timer is not None:
+                prefetch_timer.cancel()
+            prefetch_timer = loop.call_later(0.15, start_prefetch, buffer.text)
+        
+        if self.claude.semantic_cache is not None:
+            session.default_buffer.on_text_changed += on_text_changed
         
         while True:
-            user_input = input("You: ").strip()
+            try:
+                user_input = (await session.prompt_async("You: ")).strip()
+            except (EOFError, KeyboardInterrupt):
+                user_input = 'quit'
             
             if user_input.lower() in ['quit', 'exit', 'q']:
                 print("👋 Goodbye!")
+                logger.info("Fast-exit routes: %s", dict(fast_exit.STATS))
                 break
             
+            if user_input.lower() == '/reset':
+                self.history.clear()
+                print("🧹 Conversation cleared\n")
+                continue
+            
             if not user_input:
                 continue
             
-            response = self.process_request(user_input)
-            print(f"\nButler: {response}\n")
+            print("\nButler: ", end="", flush=True)
+            try:
+                async for token in self.stream_request(user_input):
+                    sys.stdout.write(token)
+                    sys.stdout.flush()
+            except Exception as e:
+                print(f"❌ Error processing request: {e}", end="")
+            print("\n")
+
+class _JsonFormatter(logging.Formatter):
+    """One JSON object per log line, for CloudWatch Logs Insights."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue to a background writer thread.
+    
+    Request paths only enqueue records; formatting and stdout writes
+    happen on the listener thread. LOG_LEVEL sets verbosity and
+    LOG_FORMAT=json switches to structured output.
+    
+    Returns:
+        The started listener; stop it on shutdown to flush pending records
+    """
+    handler = logging.StreamHandler(sys.stdout)
+    if os.getenv('LOG_FORMAT', '').lower() == 'json':
+        handler.setFormatter(_JsonFormatter())
+    else:
+        handler.setFormatter(
+            logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s')
+        )
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+async def _health_check(butler: ButlerAgent) -> bool:
+    """Run the health check, then shut down shared connections."""
+    try:
+        return await butler.run_health_check()
+    finally:
+        await butler.aclose()
 
 def main():
     """Main entry point for Butler agent."""
@@ -112,16 +349,20 @@ def main():
     )
 
     args = parser.parse_args()
+    listener = configure_logging()
 
-    butler = ButlerAgent(tenant_id=args.tenant_id)
+    try:
+        butler = ButlerAgent(tenant_id=args.tenant_id)
 
-    if args.health_check:
-        success = butler.run_health_check()
-        sys.exit(0 if success else 1)
-    else:
-        # CHANGE THIS PART:
-        import time
-        print("🤵 Butler Agent - Running in production mode")
-        print("Waiting for API requests...")
-        while True:
-            time.sleep(60)  # Sleep for 60 seconds, stay alive
+        if args.health_check:
+            success = asyncio.run(_health_check(butler))
+            sys.exit(0 if success else 1)
+        else:
+            # CHANGE THIS PART:
+            import time
+            logger.info("Butler Agent running in production mode")
+            logger.info("Waiting for API requests...")
+            while True:
+                time.sleep(60)  # Sleep for 60 seconds, stay alive
+    finally:
+        listener.stop()
@@ -0,0 +1,119 @@
+"""Async PostgreSQL helper for OpenClaw agents, backed by asyncpg."""
+import asyncpg
+import logging
+import os
+from typing import Optional
+
+from .database import _PG_VERSION_CACHE, _dsn
+
+logger = logging.getLogger(__name__)
+
+# One pool for all tenants; tenant context is applied per acquire (see
+# AsyncDatabase.execute), so connection count doesn't grow with tenants
+_POOL: Optional[asyncpg.Pool] = None
+
+async def _get_pool() -> asyncpg.Pool:
+    """Return the shared connection pool, creating it on first use."""
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+    
+    pool = await asyncpg.create_pool(
+        host=os.getenv('DB_HOST'),
+        port=int(os.getenv('DB_PORT', 5432)),
+        database=os.getenv('DB_NAME'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        min_size=1,
+        max_size=int(os.getenv('DB_POOL_MAX', '10'))
+    )
+    
+    # Another task may have created the pool while we were connecting
+    if _POOL is None:
+        _POOL = pool
+    else:
+        await pool.close()
+    return _POOL
+
+async def close_pool():
+    """Close the shared pool, e.g. on shutdown."""
+    global _POOL
+    if _POOL is not None:
+        pool, _POOL = _POOL, None
+        await pool.close()
+
+class AsyncDatabase:
+    """Async PostgreSQL access with tenant isolation."""
+    
+    def __init__(self, tenant_id: Optional[str] = None):
+        """
+        Initialize database helper.
+        
+        Args:
+            tenant_id: Optional tenant identifier for multi-tenancy
+        """
+        self.tenant_id = tenant_id
+        self.pool = None
+    
+    async def connect(self):
+        """Attach to the shared connection pool."""
+        try:
+            self.pool = await _get_pool()
+            
+            dsn = _dsn()
+            if dsn not in _PG_VERSION_CACHE:
+                _PG_VERSION_CACHE[dsn] = await self.pool.fetchval("SELECT version()")
+            return self
+            
+        except Exception as e:
+            logger.error("Database connection failed: %s", e)
+            raise
+    
+    async def execute(self, query: str, *params) -> list:
+        """
+        Execute a query and return results.
+        
+        A connection is acquired per call because asyncpg connections
+        can't be shared by concurrent tasks; this lets callers
+        asyncio.gather several queries on one AsyncDatabase. The tenant
+        context costs one extra roundtrip per call, and only when
+        tenant_id is set. It is set for the session, and asyncpg's
+        RESET ALL on release clears it before the connection's next user.
+        
+        Args:
+            query: SQL using $1, $2, ... placeholders
+            *params: Query parameters
+            
+        Returns:
+            List of asyncpg Records (empty for statements without rows)
+        """
+        async with self.pool.acquire() as connection:
+            if self.tenant_id:
+                await connection.execute(
+                    "SELECT set_config('app.tenant_id', $1, false)",
+                    self.tenant_id
+                )
+            return await connection.fetch(query, *params)
+    
+    async def ping(self) -> str:
+        """
+        Check connectivity with a minimal roundtrip.
+        
+        Returns:
+            The server version string, fetched once per process at connect
+        """
+        # Liveness needs no tenant context, so skip execute's transaction
+        await self.pool.fetchval("SELECT 1")
+        return _PG_VERSION_CACHE[_dsn()]
+    
+    async def close(self):
+        """Detach from the pool; pooled connections stay open for reuse."""
+        self.pool = None
+    
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return await self.connect()
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.close()
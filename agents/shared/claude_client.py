@@ -1,72 +1,941 @@
 """Claude API client using AWS Bedrock."""
+import aioboto3
+import asyncio
 import boto3
+import concurrent.futures
+import contextlib
+import hashlib
+import httpx
 import json
+import logging
 import os
-from typing import List, Dict, Any
+import re
+import threading
+import uuid
+import weakref
+from aiobotocore.config import AioConfig
+from botocore.auth import SigV4Auth
+from botocore.awsrequest import AWSRequest
+from botocore.config import Config
+from botocore.exceptions import NoCredentialsError
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback keeps the module deployable without the wheel
+    orjson = None
+
+from .llm_cache import InMemoryLRU, cache_from_env, semantic_cache_from_env
+
+logger = logging.getLogger(__name__)
+
+# Batch job states that haven't produced output yet
+_BATCH_PENDING = {'Submitted', 'Validating', 'Scheduled', 'InProgress', 'Stopping'}
+# Bedrock rejects batch jobs with fewer records than this at validation
+_BATCH_MIN_RECORDS = int(os.getenv('BEDROCK_BATCH_MIN_RECORDS', '100'))
+
+# Clients are expensive to build (service model, endpoint resolver,
+# signer), so they are shared process-wide, one per region.
+_BEDROCK_POOL_SIZE = int(os.getenv('BEDROCK_POOL', '50'))
+_BEDROCK_RETRIES = {'max_attempts': 3, 'mode': 'adaptive'}
+_SESSION = boto3.session.Session()
+_ASYNC_SESSION = aioboto3.Session()
+_CLIENT_CACHE: Dict[str, Any] = {}
+_CLIENT_LOCK = threading.Lock()
+# aiobotocore clients hold an aiohttp connector bound to the event loop,
+# so the long-lived async clients are kept per loop (then per region) and
+# entered on an AsyncExitStack that close_clients() unwinds on shutdown.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_ASYNC_STACKS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, contextlib.AsyncExitStack]" = (
+    weakref.WeakKeyDictionary()
+)
+# Worker threads for running sync boto3 calls off the event loop; sized
+# to the connection pool by default so threads don't queue on connections.
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('BEDROCK_WORKERS', str(_BEDROCK_POOL_SIZE))),
+    thread_name_prefix='bedrock'
+)
+
+# Shared HTTP/2 clients for the SigV4 transport, created on first use;
+# per loop for the same reason as _ASYNC_CLIENTS
+_HTTPX_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def _get_httpx_client() -> httpx.AsyncClient:
+    """Return the running loop's shared HTTP/2 client used by ainvoke_raw."""
+    loop = asyncio.get_running_loop()
+    client = _HTTPX_CLIENTS.get(loop)
+    if client is None:
+        client = _HTTPX_CLIENTS[loop] = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=100),
+            timeout=httpx.Timeout(60.0, connect=5.0)
+        )
+    return client
+
+def _get_client(region: str):
+    """Return the shared keepalive bedrock-runtime client for a region."""
+    client = _CLIENT_CACHE.get(region)
+    if client is None:
+        # boto3 sessions aren't thread-safe, so serialize client creation
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(region)
+            if client is None:
+                client = _SESSION.client(
+                    'bedrock-runtime',
+                    region_name=region,
+                    config=Config(
+                        max_pool_connections=_BEDROCK_POOL_SIZE,
+                        retries=_BEDROCK_RETRIES,
+                        tcp_keepalive=True
+                    )
+                )
+                _CLIENT_CACHE[region] = client
+    return client
+
+async def _get_async_client(region: str):
+    """Return the running loop's shared keepalive aioboto3 bedrock-runtime client."""
+    loop = asyncio.get_running_loop()
+    clients = _ASYNC_CLIENTS.setdefault(loop, {})
+    client = clients.get(region)
+    if client is None:
+        stack = _ASYNC_STACKS.setdefault(loop, contextlib.AsyncExitStack())
+        created = await stack.enter_async_context(_ASYNC_SESSION.client(
+            'bedrock-runtime',
+            region_name=region,
+            config=AioConfig(
+                max_pool_connections=_BEDROCK_POOL_SIZE,
+                retries=_BEDROCK_RETRIES,
+                connector_args={'keepalive_timeout': 60}
+            )
+        ))
+        # A concurrent caller may have won the race; the extra client stays
+        # on the stack and is closed with it
+        client = clients.setdefault(region, created)
+    return client
+
+async def warm_clients(region: str = None):
+    """
+    Build the running loop's shared aioboto3 client ahead of the first call.
+    
+    Client creation loads the service model and endpoint rules and
+    resolves credentials (env/IMDS/STS) on this loop, so call it at
+    startup on the loop that will serve requests.
+    """
+    try:
+        await _get_async_client(region or os.getenv('AWS_REGION', 'us-east-1'))
+    except Exception as e:
+        logger.debug("Bedrock async warm-up failed: %s", e)
+
+async def close_clients():
+    """Close the running loop's shared Bedrock clients; call on shutdown."""
+    loop = asyncio.get_running_loop()
+    _ASYNC_CLIENTS.pop(loop, None)
+    stack = _ASYNC_STACKS.pop(loop, None)
+    if stack is not None:
+        await stack.aclose()
+    httpx_client = _HTTPX_CLIENTS.pop(loop, None)
+    if httpx_client is not None:
+        await httpx_client.aclose()
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes, which boto3 accepts as a request body."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(',', ':')).encode()
+
+def _text_of(content: Any) -> str:
+    """Plain text of a message's content, whether a string or content blocks."""
+    if isinstance(content, str):
+        return content
+    return "\n".join(block.get("text", "") for block in content)
+
+def _as_blocks(content: Any) -> List[Dict[str, Any]]:
+    """Content as a list of content blocks."""
+    if isinstance(content, str):
+        return [{"type": "text", "text": content}]
+    return list(content)
+
+def _merge_turns(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop empty messages and merge consecutive messages from the same role."""
+    merged: List[Dict[str, Any]] = []
+    for message in messages:
+        content = message.get("content")
+        if not content or (isinstance(content, str) and not content.strip()):
+            continue
+        
+        if merged and merged[-1]["role"] == message["role"]:
+            previous = merged[-1]["content"]
+            if isinstance(previous, str) and isinstance(content, str):
+                combined = f"{previous}\n\n{content}"
+            else:
+                combined = _as_blocks(previous) + _as_blocks(content)
+            merged[-1] = {**merged[-1], "content": combined}
+        else:
+            merged.append(message)
+    return merged
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _warm(region: str):
+    """
+    Do the sync path's first-call cold work ahead of time.
+    
+    Resolves credentials and builds the shared boto3 client used by the
+    executor transport and summaries. The aioboto3 session is left to
+    warm_clients, which runs on the event loop that will use it.
+    """
+    try:
+        with _CLIENT_LOCK:
+            credentials = _SESSION.get_credentials()
+        if credentials is not None:
+            credentials.get_frozen_credentials()
+        client = _get_client(region)
+        client.meta.service_model.operation_names
+    except Exception as e:
+        logger.debug("Bedrock warm-up failed: %s", e)
+
+def _split_s3_uri(uri: str) -> Tuple[str, str]:
+    """Split s3://bucket/key into (bucket, key)."""
+    bucket, _, key = uri[len('s3://'):].partition('/')
+    return bucket, key
+
+# Warm up in the background at import; BEDROCK_PREWARM=0 disables it
+if os.getenv('BEDROCK_PREWARM', '1') != '0':
+    threading.Thread(
+        target=_warm,
+        args=(os.getenv('AWS_REGION', 'us-east-1'),),
+        name='bedrock-warmup',
+        daemon=True
+    ).start()
 
 class ClaudeClient:
     """Wrapper for Claude API via AWS Bedrock."""
     
-    def __init__(self):
-        """Initialize Bedrock client."""
-        self.client = boto3.client(
-            'bedrock-runtime',
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
-        )
+    def __init__(self, tenant_id: str = None):
+        """
+        Initialize Bedrock session.
+        
+        Args:
+            tenant_id: Optional tenant identifier, used to partition caches
+        """
+        self.tenant_id = tenant_id
+        self.region = os.getenv('AWS_REGION', 'us-east-1')
         self.model_id = os.getenv(
             'CLAUDE_MODEL_ID', 
             'anthropic.claude-3-5-sonnet-20241022-v2:0'
         )
+        # Sync calls use the shared boto3 client and async calls the
+        # running loop's shared aioboto3 client (see _get_async_client);
+        # the session is also used for one-off S3/batch clients.
+        self.client = _get_client(self.region)
+        self._session = _ASYNC_SESSION
+        # "aioboto3" (default), "executor" to run the shared boto3 client
+        # on a thread pool, or "httpx" for direct SigV4-signed HTTP/2
+        self.async_transport = os.getenv('BEDROCK_ASYNC_TRANSPORT', 'aioboto3')
+        self._executor = _EXECUTOR
+        self._credentials = self._load_credentials() if self.async_transport == 'httpx' else None
+        # Token usage of the last non-streamed call, incl. prompt cache reads
+        self.last_usage: Dict[str, int] = {}
+        self.cache = cache_from_env()
+        self.semantic_cache = semantic_cache_from_env(tenant_id)
+        # Long conversations keep the last turns verbatim and send older
+        # ones as a summary from a cheaper model
+        self.max_turns = int(os.getenv('CLAUDE_MAX_TURNS', '40'))
+        self.summary_model_id = os.getenv(
+            'CLAUDE_SUMMARY_MODEL_ID',
+            'anthropic.claude-3-5-haiku-20241022-v1:0'
+        )
+        self._summaries = InMemoryLRU(max_entries=128)
     
-    def send_message(
+    def _build_request_body(
+        self,
+        messages: List[Dict[str, str]],
+        system: str = None,
+        max_tokens: int = 1024,
+        temperature: float = None
+    ) -> Dict[str, Any]:
+        """Build the Bedrock request body for a Messages API call."""
+        request_body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "messages": (
+                self._mark_history_cacheable(messages)
+                if len(messages) > 1 else messages
+            )
+        }
+        
+        if system:
+            # Mark the static system prompt as a cacheable prefix
+            request_body["system"] = [{
+                "type": "text",
+                "text": system,
+                "cache_control": {"type": "ephemeral"}
+            }]
+        
+        if temperature is not None:
+            request_body["temperature"] = temperature
+        
+        return request_body
+    
+    @staticmethod
+    def _mark_history_cacheable(
+        messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Put a cache breakpoint on the latest user turn.
+        
+        Everything up to and including that turn becomes a cached prefix,
+        so the next call in the same conversation reuses it. Only worth it
+        once there is history; single-turn calls skip the cache write
+        premium. The caller's list is left untouched.
+        """
+        if not messages or messages[-1].get("role") != "user":
+            return messages
+        
+        last = messages[-1]
+        content = last["content"]
+        if isinstance(content, str):
+            blocks = [{"type": "text", "text": content}]
+        else:
+            blocks = [dict(block) for block in content]
+        if not blocks:
+            return messages
+        blocks[-1]["cache_control"] = {"type": "ephemeral"}
+        
+        return messages[:-1] + [{**last, "content": blocks}]
+    
+    def _split_history(
+        self,
+        messages: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Clean up messages and split off the head that should be summarized.
+        
+        The cut point moves in steps of max_turns // 2, so the head (and
+        its cached summary) stays the same for several consecutive turns.
+        
+        Returns:
+            (head to summarize, possibly empty; tail to send verbatim)
+        """
+        cleaned = _merge_turns(messages)
+        if len(cleaned) <= self.max_turns:
+            return [], cleaned
+        
+        step = max(self.max_turns // 2, 1)
+        cut = ((len(cleaned) - step) // step) * step
+        return cleaned[:cut], cleaned[cut:]
+    
+    def _summarize(self, head: List[Dict[str, Any]]) -> str:
+        """Summarize older turns with the summary model, caching per head."""
+        key = hashlib.sha256(_dumps(head)).hexdigest()
+        summary = self._summaries.get(key)
+        if summary is None:
+            transcript = "\n".join(
+                f"{message['role']}: {_text_of(message['content'])}"
+                for message in head
+            )
+            request_body = {
+                "anthropic_version": "bedrock-2023-05-31",
+                "max_tokens": 512,
+                "messages": [{
+                    "role": "user",
+                    "content": (
+                        "Summarize this conversation, keeping facts, decisions "
+                        f"and open requests:\n\n{transcript}"
+                    )
+                }]
+            }
+            response = self.client.invoke_model(
+                modelId=self.summary_model_id,
+                body=_dumps(request_body)
+            )
+            summary = _loads(response['body'].read())['content'][0]['text']
+            self._summaries.set(key, summary, ttl=3600)
+        return summary
+    
+    @staticmethod
+    def _with_summary(
+        summary: str,
+        tail: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Prepend a summary of earlier turns to the recent ones."""
+        return _merge_turns(
+            [{"role": "user", "content": f"[context summary] {summary}"}] + tail
+        )
+    
+    def _compact(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Trim messages before sending; see _split_history."""
+        head, tail = self._split_history(messages)
+        if not head:
+            return tail
+        try:
+            return self._with_summary(self._summarize(head), tail)
+        except Exception as e:
+            logger.warning("History summary failed, sending full history: %s", e)
+            return head + tail
+    
+    async def _acompact(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Async _compact; the summary call runs on the worker pool."""
+        head, tail = self._split_history(messages)
+        if not head:
+            return tail
+        try:
+            loop = asyncio.get_running_loop()
+            summary = await loop.run_in_executor(self._executor, self._summarize, head)
+            return self._with_summary(summary, tail)
+        except Exception as e:
+            logger.warning("History summary failed, sending full history: %s", e)
+            return head + tail
+    
+    def _serialize(self, request_body: Dict[str, Any]) -> bytes:
+        """Serialize a request body, recording its size."""
+        body_bytes = _dumps(request_body)
+        logger.debug("Bedrock request body: %d bytes", len(body_bytes))
+        return body_bytes
+    
+    def _invoke_kwargs(self, request_body: Dict[str, Any]) -> Dict[str, Any]:
+        """Keyword arguments shared by InvokeModel and its streaming variant."""
+        return {
+            "modelId": self.model_id,
+            "body": self._serialize(request_body)
+        }
+    
+    def _cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool = True
+    ) -> Optional[str]:
+        """Exact-match cache key for a call, or None if it isn't cacheable."""
+        if not use_cache or self.cache is None or (temperature and temperature > 0):
+            return None
+        return self.cache.make_key(self.model_id, system, messages, max_tokens)
+    
+    def _cache_lookup(
+        self,
+        messages: List[Dict[str, str]],
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool = True
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Check the exact-match cache.
+        
+        Returns:
+            (cache key, cached text); the key is None when the call
+            isn't cacheable, the text is None on a miss
+        """
+        cache_key = self._cache_key(
+            messages, system, max_tokens, temperature, use_cache
+        )
+        if cache_key is None:
+            return None, None
+        return cache_key, self.cache.get(cache_key)
+    
+    async def _acache_lookup(
+        self,
+        messages: List[Dict[str, str]],
+        system: str,
+        max_tokens: int,
+        temperature: float,
+        use_cache: bool = True
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """_cache_lookup without blocking the event loop on a Redis backend."""
+        cache_key = self._cache_key(
+            messages, system, max_tokens, temperature, use_cache
+        )
+        if cache_key is None:
+            return None, None
+        return cache_key, await self.cache.aget(cache_key)
+    
+    def _parse_response(self, raw_body: bytes) -> str:
+        """Extract the text from an InvokeModel response body."""
+        response_body = _loads(raw_body)
+        self.last_usage = response_body.get('usage', {})
+        return response_body['content'][0]['text']
+    
+    def _load_credentials(self):
+        """
+        Resolve the session credentials used by ainvoke_raw, once per client.
+        
+        The refreshable object is kept so temporary (task role) credentials
+        keep rotating; each request signs with a frozen snapshot of it.
+        
+        Raises:
+            NoCredentialsError: If no AWS credentials are configured
+        """
+        with _CLIENT_LOCK:
+            credentials = _SESSION.get_credentials()
+        if credentials is None:
+            raise NoCredentialsError()
+        return credentials
+    
+    async def _frozen_credentials(self):
+        """
+        Snapshot the credentials for signing one request.
+        
+        A due refresh (STS, container or IMDS call) runs in a worker
+        thread so it doesn't block the event loop; otherwise this is a
+        cheap in-memory read.
+        """
+        refresh_needed = getattr(self._credentials, 'refresh_needed', None)
+        if refresh_needed is not None and refresh_needed():
+            return await asyncio.to_thread(self._credentials.get_frozen_credentials)
+        return self._credentials.get_frozen_credentials()
+    
+    async def ainvoke_raw(self, body_bytes: bytes) -> bytes:
+        """
+        POST an InvokeModel request directly over HTTP/2, bypassing botocore.
+        
+        Skips botocore's per-call endpoint resolution, event hooks and
+        retry handler setup; many concurrent calls share one connection.
+        
+        Args:
+            body_bytes: Serialized request body
+            
+        Returns:
+            The raw response body
+        """
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+        
+        request = AWSRequest(
+            method='POST',
+            url=(
+                f"https://bedrock-runtime.{self.region}.amazonaws.com"
+                f"/model/{quote(self.model_id, safe='')}/invoke"
+            ),
+            data=body_bytes,
+            headers=headers
+        )
+        # Freeze per request so a refresh can't mix old and new key parts
+        signer = SigV4Auth(await self._frozen_credentials(), 'bedrock', self.region)
+        signer.add_auth(request)
+        prepared = request.prepare()
+        
+        response = await _get_httpx_client().post(
+            prepared.url,
+            headers=dict(prepared.headers),
+            content=body_bytes
+        )
+        if response.is_error:
+            logger.error(
+                "Bedrock request failed (%s): %s",
+                response.status_code, response.text
+            )
+        response.raise_for_status()
+        return response.content
+    
+    async def ainvoke(self, request_body: Dict[str, Any]) -> str:
+        """
+        Invoke the model on the shared sync client from a worker thread.
+        
+        The body is serialized on the calling thread; only the blocking
+        HTTP call and response read run in the executor, so other
+        coroutines keep running during the Bedrock roundtrip.
+        
+        Args:
+            request_body: Body from _build_request_body
+            
+        Returns:
+            Claude's response text
+        """
+        kwargs = self._invoke_kwargs(request_body)
+        loop = asyncio.get_running_loop()
+        raw_body = await loop.run_in_executor(
+            self._executor,
+            lambda: self.client.invoke_model(**kwargs)['body'].read()
+        )
+        return self._parse_response(raw_body)
+    
+    async def asend_message(
         self, 
         messages: List[Dict[str, str]], 
         system: str = None,
-        max_tokens: int = 1024
+        max_tokens: int = 1024,
+        temperature: float = None,
+        use_cache: bool = True
     ) -> str:
         """
-        Send a message to Claude and get response.
+        Send a message to Claude without blocking the event loop.
         
         Args:
             messages: List of message dicts [{"role": "user", "content": "..."}]
             system: Optional system prompt
             max_tokens: Maximum tokens in response
+            temperature: Optional sampling temperature; responses sampled
+                above 0 are never cached
+            use_cache: Set False to always call Bedrock, e.g. for health checks
             
         Returns:
             Claude's response text
         """
+        cache_key, cached = await self._acache_lookup(
+            messages, system, max_tokens, temperature, use_cache
+        )
+        if cached is not None:
+            return cached
+        
         try:
-            request_body = {
-                "anthropic_version": "bedrock-2023-05-31",
-                "max_tokens": max_tokens,
-                "messages": messages
-            }
+            request_body = self._build_request_body(
+                await self._acompact(messages), system, max_tokens, temperature
+            )
             
-            if system:
-                request_body["system"] = system
+            if self.async_transport == 'executor':
+                text = await self.ainvoke(request_body)
+            elif self.async_transport == 'httpx':
+                text = self._parse_response(
+                    await self.ainvoke_raw(self._serialize(request_body))
+                )
+            else:
+                client = await _get_async_client(self.region)
+                response = await client.invoke_model(
+                    **self._invoke_kwargs(request_body)
+                )
+                text = self._parse_response(await response['body'].read())
             
-            response = self.client.invoke_model(
-                modelId=self.model_id,
-                body=json.dumps(request_body)
+        except Exception as e:
+            logger.error("Claude API error: %s", e)
+            raise
+        
+        if cache_key is not None:
+            await self.cache.aset(cache_key, text)
+        return text
+    
+    def send_message(
+        self, 
+        messages: List[Dict[str, str]], 
+        system: str = None,
+        max_tokens: int = 1024,
+        temperature: float = None,
+        use_cache: bool = True
+    ) -> str:
+        """
+        Send a message to Claude and get response (blocking).
+        
+        Args:
+            messages: List of message dicts [{"role": "user", "content": "..."}]
+            system: Optional system prompt
+            max_tokens: Maximum tokens in response
+            temperature: Optional sampling temperature; responses sampled
+                above 0 are never cached
+            use_cache: Set False to always call Bedrock, e.g. for health checks
+            
+        Returns:
+            Claude's response text
+        """
+        cache_key, cached = self._cache_lookup(
+            messages, system, max_tokens, temperature, use_cache
+        )
+        if cached is not None:
+            return cached
+        
+        try:
+            request_body = self._build_request_body(
+                self._compact(messages), system, max_tokens, temperature
             )
             
-            response_body = json.loads(response['body'].read())
-            return response_body['content'][0]['text']
+            response = self.client.invoke_model(
+                **self._invoke_kwargs(request_body)
+            )
+            text = self._parse_response(response['body'].read())
             
         except Exception as e:
-            print(f"❌ Claude API error: {e}")
+            logger.error("Claude API error: %s", e)
             raise
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, text)
+        return text
     
-    def chat(self, user_message: str, system: str = None) -> str:
+    async def achat(
+        self, user_message: str, system: str = None, use_cache: bool = True
+    ) -> str:
+        """
+        Simple async chat interface.
+        
+        Args:
+            user_message: The user's message
+            system: Optional system prompt
+            use_cache: Set False to skip the exact and semantic caches
+            
+        Returns:
+            Claude's response
+        """
+        if not use_cache:
+            return await self.asend_message(
+                [{"role": "user", "content": user_message}],
+                system=system,
+                use_cache=False
+            )
+        
+        if self.semantic_cache is not None:
+            cached = await asyncio.to_thread(
+                self.semantic_cache.get, user_message, system
+            )
+            if cached is not None:
+                return cached
+        
+        messages = [{"role": "user", "content": user_message}]
+        response = await self.asend_message(messages, system=system)
+        
+        if self.semantic_cache is not None:
+            await asyncio.to_thread(
+                self.semantic_cache.add, user_message, response, system
+            )
+        return response
+    
+    def chat(
+        self, user_message: str, system: str = None, use_cache: bool = True
+    ) -> str:
         """
         Simple chat interface.
         
         Args:
             user_message: The user's message
             system: Optional system prompt
+            use_cache: Set False to skip the exact and semantic caches
             
         Returns:
             Claude's response
         """
+        if not use_cache:
+            return self.send_message(
+                [{"role": "user", "content": user_message}],
+                system=system,
+                use_cache=False
+            )
+        
+        if self.semantic_cache is not None:
+            cached = self.semantic_cache.get(user_message, system)
+            if cached is not None:
+                return cached
+        
+        messages = [{"role": "user", "content": user_message}]
+        response = self.send_message(messages, system=system)
+        
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(user_message, response, system)
+        return response
+    
+    async def astream_message(
+        self,
+        messages: List[Dict[str, Any]],
+        system: str = None,
+        max_tokens: int = 1024
+    ) -> AsyncIterator[str]:
+        """
+        Stream Claude's response as it is generated.
+        
+        Uses InvokeModelWithResponseStream so callers can show the first
+        tokens long before the full completion is ready. Cached responses
+        are yielded as a single chunk.
+        
+        Args:
+            messages: List of message dicts [{"role": "user", "content": "..."}]
+            system: Optional system prompt
+            max_tokens: Maximum tokens in response
+            
+        Yields:
+            Text fragments of Claude's response
+        """
+        cache_key, cached = await self._acache_lookup(messages, system, max_tokens, None)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        try:
+            request_body = self._build_request_body(
+                await self._acompact(messages), system, max_tokens
+            )
+            
+            client = await _get_async_client(self.region)
+            response = await client.invoke_model_with_response_stream(
+                **self._invoke_kwargs(request_body)
+            )
+            async for event in response['body']:
+                chunk = _loads(event['chunk']['bytes'])
+                if chunk['type'] == 'content_block_delta':
+                    text = chunk['delta'].get('text', '')
+                    parts.append(text)
+                    yield text
+            
+        except Exception as e:
+            logger.error("Claude API error: %s", e)
+            raise
+        
+        if cache_key is not None:
+            await self.cache.aset(cache_key, ''.join(parts))
+    
+    async def astream_chat(
+        self,
+        user_message: str,
+        system: str = None,
+        max_tokens: int = 1024
+    ) -> AsyncIterator[str]:
+        """
+        Simple streaming chat interface.
+        
+        Args:
+            user_message: The user's message
+            system: Optional system prompt
+            max_tokens: Maximum tokens in response
+            
+        Yields:
+            Text fragments of Claude's response
+        """
+        if self.semantic_cache is not None:
+            cached = await asyncio.to_thread(
+                self.semantic_cache.get, user_message, system
+            )
+            if cached is not None:
+                yield cached
+                return
+        
         messages = [{"role": "user", "content": user_message}]
-        return self.send_message(messages, system=system)
\ No newline at end of file
+        parts = []
+        async for text in self.astream_message(messages, system, max_tokens):
+            parts.append(text)
+            yield text
+        
+        if self.semantic_cache is not None:
+            await asyncio.to_thread(
+                self.semantic_cache.add, user_message, ''.join(parts), system
+            )
+    
+    async def submit_batch(
+        self, jobs: List[Dict[str, Any]], label: str = None
+    ) -> str:
+        """
+        Submit prompts as a Bedrock batch inference job.
+        
+        Batch jobs are billed at a discount and complete asynchronously
+        (within 24h), so use them for scheduled work, not interactive chat.
+        Requires BEDROCK_BATCH_BUCKET and BEDROCK_BATCH_ROLE_ARN (a role
+        Bedrock assumes to read/write the bucket). Bedrock enforces a
+        minimum number of records per job, so callers should pool prompts
+        (e.g. across tenants) until they reach BEDROCK_BATCH_MIN_RECORDS.
+        
+        Args:
+            jobs: List of {"record_id": str, "messages": [...],
+                  "system": optional str, "max_tokens": optional int}
+            label: Names the job and its S3 prefix, e.g. "daily-briefing"
+                for a job pooled across tenants (defaults to the tenant)
+            
+        Returns:
+            The batch job ARN, to pass to poll_batch
+            
+        Raises:
+            ValueError: If batch config is missing or there are too few jobs
+        """
+        bucket = os.getenv('BEDROCK_BATCH_BUCKET')
+        role_arn = os.getenv('BEDROCK_BATCH_ROLE_ARN')
+        if not bucket or not role_arn:
+            raise ValueError(
+                "BEDROCK_BATCH_BUCKET and BEDROCK_BATCH_ROLE_ARN must be set "
+                "to submit batch jobs"
+            )
+        if len(jobs) < _BATCH_MIN_RECORDS:
+            raise ValueError(
+                f"Batch jobs need at least {_BATCH_MIN_RECORDS} records, "
+                f"got {len(jobs)}"
+            )
+        # Job names allow only letters, digits, '+', '-' and '.'
+        label = re.sub(r'[^A-Za-z0-9+.-]', '-', label or self.tenant_id or 'default')
+        job_name = f"butler-{label}-{uuid.uuid4().hex[:12]}"
+        prefix = f"bedrock-batch/{job_name}"
+        
+        records = [
+            _dumps({
+                "recordId": job["record_id"],
+                "modelInput": self._build_request_body(
+                    job["messages"],
+                    job.get("system"),
+                    job.get("max_tokens", 1024)
+                )
+            })
+            for job in jobs
+        ]
+        
+        try:
+            async with self._session.client('s3', region_name=self.region) as s3:
+                await s3.put_object(
+                    Bucket=bucket,
+                    Key=f"{prefix}/input.jsonl",
+                    Body=b'\n'.join(records)
+                )
+            
+            async with self._session.client('bedrock', region_name=self.region) as bedrock:
+                response = await bedrock.create_model_invocation_job(
+                    jobName=job_name,
+                    roleArn=role_arn,
+                    modelId=self.model_id,
+                    inputDataConfig={'s3InputDataConfig': {
+                        's3Uri': f"s3://{bucket}/{prefix}/input.jsonl",
+                        's3InputFormat': 'JSONL'
+                    }},
+                    outputDataConfig={'s3OutputDataConfig': {
+                        's3Uri': f"s3://{bucket}/{prefix}/output/"
+                    }}
+                )
+            
+            return response['jobArn']
+            
+        except Exception as e:
+            logger.error("Batch submission failed: %s", e)
+            raise
+    
+    async def poll_batch(self, job_arn: str) -> Optional[Dict[str, str]]:
+        """
+        Fetch the results of a batch job submitted with submit_batch.
+        
+        Args:
+            job_arn: ARN returned by submit_batch
+            
+        Returns:
+            None while the job is still running, otherwise a dict mapping
+            record_id to Claude's response text (failed records are omitted)
+        """
+        async with self._session.client('bedrock', region_name=self.region) as bedrock:
+            job = await bedrock.get_model_invocation_job(jobIdentifier=job_arn)
+        
+        status = job['status']
+        if status in _BATCH_PENDING:
+            return None
+        if status not in ('Completed', 'PartiallyCompleted'):
+            raise RuntimeError(
+                f"Batch job {job_arn} ended with status {status}: "
+                f"{job.get('message', '')}"
+            )
+        
+        # Bedrock writes <output prefix>/<job id>/<input file>.out
+        _, input_key = _split_s3_uri(job['inputDataConfig']['s3InputDataConfig']['s3Uri'])
+        bucket, output_prefix = _split_s3_uri(job['outputDataConfig']['s3OutputDataConfig']['s3Uri'])
+        job_id = job_arn.rsplit('/', 1)[-1]
+        output_key = f"{output_prefix.rstrip('/')}/{job_id}/{os.path.basename(input_key)}.out"
+        
+        async with self._session.client('s3', region_name=self.region) as s3:
+            response = await s3.get_object(Bucket=bucket, Key=output_key)
+            body = await response['Body'].read()
+        
+        results = {}
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            record = _loads(line)
+            output = record.get('modelOutput')
+            if output:
+                results[record['recordId']] = output['content'][0]['text']
+        return results
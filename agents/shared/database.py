@@ -1,8 +1,45 @@
 """PostgreSQL database connection helper for OpenClaw agents."""
 import psycopg2
-from psycopg2.extras import RealDictCursor
+import psycopg2.pool
+from psycopg2.extras import DictCursor, execute_batch, execute_values
+import logging
 import os
-from typing import Optional, Dict, Any
+import re
+import threading
+import uuid
+from typing import Iterator, List, Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+_POOL: Optional[psycopg2.pool.ThreadedConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+# Server version per DSN; it can't change while the process is running
+_PG_VERSION_CACHE: Dict[str, str] = {}
+
+def _dsn() -> str:
+    """Identify the configured database for the version cache."""
+    return f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT', 5432)}/{os.getenv('DB_NAME')}"
+
+# Matches the single-placeholder template execute_values expects
+_VALUES_TEMPLATE = re.compile(r'\bVALUES\s+%s', re.IGNORECASE)
+
+def _get_pool() -> psycopg2.pool.ThreadedConnectionPool:
+    """Return the process-wide connection pool, creating it on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+                    host=os.getenv('DB_HOST'),
+                    port=os.getenv('DB_PORT', 5432),
+                    dbname=os.getenv('DB_NAME'),
+                    user=os.getenv('DB_USER'),
+                    password=os.getenv('DB_PASSWORD')
+                )
+    return _POOL
 
 class Database:
     """Manages PostgreSQL connections with tenant isolation."""
@@ -18,16 +55,9 @@ class Database:
         self.connection = None
     
     def connect(self):
-        """Establish connection to PostgreSQL."""
+        """Check out a pooled connection to PostgreSQL."""
         try:
-            self.connection = psycopg2.connect(
-                host=os.getenv('DB_HOST'),
-                port=os.getenv('DB_PORT', 5432),
-                dbname=os.getenv('DB_NAME'),
-                user=os.getenv('DB_USER'),
-                password=os.getenv('DB_PASSWORD'),
-                cursor_factory=RealDictCursor
-            )
+            self.connection = _get_pool().getconn()
             
             # Set tenant context if provided
             if self.tenant_id:
@@ -37,15 +67,26 @@ class Database:
                         (self.tenant_id,)
                     )
             
-            print(f"✅ Connected to database: {os.getenv('DB_NAME')}")
+            dsn = _dsn()
+            if dsn not in _PG_VERSION_CACHE:
+                with self.connection.cursor() as cursor:
+                    cursor.execute("SELECT version()")
+                    _PG_VERSION_CACHE[dsn] = cursor.fetchone()[0]
+            
+            logger.debug("Checked out pooled connection (tenant=%s)", self.tenant_id)
             return self
             
         except Exception as e:
-            print(f"❌ Database connection failed: {e}")
+            logger.error("Database connection failed: %s", e)
+            if self.connection is not None:
+                # Don't return a connection with a half-applied tenant
+                # context (or a broken socket) to the pool
+                _get_pool().putconn(self.connection, close=True)
+                self.connection = None
             raise
     
     def execute(self, query: str, params: tuple = None) -> list:
-        """Execute a query and return results."""
+        """Execute a query and return results as tuples."""
         with self.connection.cursor() as cursor:
             cursor.execute(query, params)
             if cursor.description:  # SELECT query
@@ -53,11 +94,92 @@ class Database:
             self.connection.commit()  # INSERT/UPDATE/DELETE
             return []
     
+    def ping(self) -> str:
+        """
+        Check the connection with a minimal roundtrip.
+        
+        Returns:
+            The server version string, fetched once per process at connect
+        """
+        self.execute("SELECT 1")
+        return _PG_VERSION_CACHE[_dsn()]
+    
+    def execute_dict(self, query: str, params: tuple = None) -> list:
+        """Execute a query and return rows addressable by column name."""
+        with self.connection.cursor(cursor_factory=DictCursor) as cursor:
+            cursor.execute(query, params)
+            if cursor.description:  # SELECT query
+                return cursor.fetchall()
+            self.connection.commit()  # INSERT/UPDATE/DELETE
+            return []
+    
+    def executemany(
+        self,
+        query: str,
+        rows: List[tuple],
+        page_size: int = 500
+    ) -> None:
+        """
+        Write many rows in as few roundtrips as possible.
+        
+        INSERTs must use a single VALUES placeholder and are expanded into
+        multi-row statements, e.g.
+        
+            db.executemany(
+                "INSERT INTO emails (tenant, subject, body) VALUES %s",
+                [(tenant, subject, body), ...]
+            )
+        
+        Any other statement (e.g. UPDATE ... WHERE id = %s) is sent in
+        batches of page_size per roundtrip.
+        
+        Args:
+            query: SQL statement
+            rows: Parameter tuples, one per row
+            page_size: Rows sent per roundtrip
+        """
+        with self.connection.cursor() as cursor:
+            if _VALUES_TEMPLATE.search(query):
+                execute_values(cursor, query, rows, page_size=page_size)
+            else:
+                execute_batch(cursor, query, rows, page_size=page_size)
+        self.connection.commit()
+    
+    def iterate(
+        self,
+        query: str,
+        params: tuple = None,
+        itersize: int = 2000
+    ) -> Iterator[tuple]:
+        """
+        Stream a large SELECT through a server-side cursor.
+        
+        Rows are fetched itersize at a time instead of materializing the
+        whole result set, e.g. for a tenant's full mailbox.
+        """
+        name = f"iter_{uuid.uuid4().hex}"
+        with self.connection.cursor(name=name) as cursor:
+            cursor.itersize = itersize
+            cursor.execute(query, params)
+            for row in cursor:
+                yield row
+    
     def close(self):
-        """Close database connection."""
+        """Return the connection to the pool with tenant context cleared."""
         if self.connection:
-            self.connection.close()
-            print("✅ Database connection closed")
+            pool = _get_pool()
+            try:
+                # Clear tenant context so RLS can't leak to the next checkout
+                self.connection.rollback()
+                with self.connection.cursor() as cursor:
+                    cursor.execute("RESET app.tenant_id")
+                self.connection.commit()
+                pool.putconn(self.connection)
+                logger.debug("Returned connection to pool (tenant=%s)", self.tenant_id)
+            except Exception:
+                # Don't return a connection in an unknown state
+                pool.putconn(self.connection, close=True)
+            self.connection = None
     
     def __enter__(self):
         """Context manager entry."""
@@ -65,4 +187,4 @@ class Database:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager exit."""
-        self.close()
\ No newline at end of file
+        self.close()
@@ -0,0 +1,77 @@
+"""Cheap input gating so trivial or disallowed requests never reach Claude."""
+from collections import Counter
+from typing import Literal, Optional
+
+try:
+    import re2 as re  # linear-time DFA matching, no backtracking
+except ImportError:
+    import re
+
+Route = Literal["direct", "reject", "llm"]
+
+# Inputs answered with a canned reply, matched against the whole message
+_DIRECT_PATTERNS = {
+    "greeting": re.compile(
+        r"^\W*(?:hi|hello|hey|howdy|yo|good (?:morning|afternoon|evening))"
+        r"(?:\s+(?:there|butler))?\W*$"
+    ),
+    "thanks": re.compile(
+        r"^\W*(?:thanks|thank you|thx|ty|cheers)(?:\s+(?:so much|a lot|butler))?\W*$"
+    ),
+    "ack": re.compile(r"^\W*(?:ok|okay|k|cool|great|got it|nice|perfect)\W*$"),
+    "empty": re.compile(r"^\W*$"),
+}
+
+DIRECT_RESPONSES = {
+    "greeting": "Hello! How can I help with your email, calendar or tasks today?",
+    "thanks": "You're welcome! Anything else I can help with?",
+    "ack": "Great. Let me know if there's anything else you need.",
+    "empty": "Could you tell me a bit more about what you need?",
+}
+
+# Prompt-injection and cross-tenant probing, matched anywhere in the message
+_REJECT_PATTERN = re.compile(
+    r"ignore (?:all |any )?(?:previous|prior|above) instructions"
+    r"|(?:reveal|show|print|repeat) (?:me )?(?:your|the) system prompt"
+    r"|(?:another|other) (?:customer|tenant)'?s? (?:data|email|calendar|account)"
+)
+
+REJECT_MESSAGE = "Sorry, I can't help with that request."
+
+# Route counts, to estimate the share of calls that skip Claude
+STATS: Counter = Counter()
+
+def _direct_kind(text: str) -> Optional[str]:
+    """Return which canned reply applies, if any."""
+    for kind, pattern in _DIRECT_PATTERNS.items():
+        if pattern.search(text):
+            return kind
+    return None
+
+def classify(user_input: str, allow_direct: bool = True) -> Route:
+    """
+    Decide how to handle a user message.
+    
+    Args:
+        user_input: The user's message
+        allow_direct: Whether canned replies may be used. Pass False
+            mid-conversation, where "ok" or "?" answers Claude's last turn.
+        
+    Returns:
+        "direct" for a canned reply, "reject" for a policy refusal,
+        "llm" when Claude is needed
+    """
+    text = user_input.strip().lower()
+    if _REJECT_PATTERN.search(text):
+        route = "reject"
+    elif allow_direct and _direct_kind(text):
+        route = "direct"
+    else:
+        route = "llm"
+    
+    STATS[route] += 1
+    return route
+
+def direct_response(user_input: str) -> str:
+    """Canned reply for a message classified as "direct"."""
+    return DIRECT_RESPONSES[_direct_kind(user_input.strip().lower()) or "empty"]
@@ -0,0 +1,382 @@
+"""Exact-match and semantic response caches for Claude calls."""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend(Protocol):
+    """Storage interface used by LLMCache."""
+    
+    def get(self, key: str) -> Optional[str]:
+        ...
+    
+    def set(self, key: str, value: str, ttl: int) -> None:
+        ...
+
+class InMemoryLRU:
+    """Bounded in-process LRU with per-entry expiry, safe to share across threads."""
+    
+    def __init__(self, max_entries: int = 1024):
+        """
+        Initialize the LRU.
+        
+        Args:
+            max_entries: Entries kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Executor threads share instances (e.g. ClaudeClient summaries)
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return a live entry, dropping it if expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store an entry, evicting the oldest one when full."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class RedisBackend:
+    """Redis-backed storage so cached responses are shared across tasks."""
+    
+    # Calls are network roundtrips; async callers run them off the loop
+    blocking = True
+    
+    def __init__(self, url: str, prefix: str = "llm:"):
+        """
+        Initialize the Redis connection.
+        
+        Args:
+            url: Redis URL, e.g. redis://cache:6379/0
+            prefix: Key prefix to namespace cache entries
+        """
+        import redis
+        
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+    
+    def get(self, key: str) -> Optional[str]:
+        """Fetch an entry; Redis handles expiry."""
+        return self.client.get(self.prefix + key)
+    
+    def set(self, key: str, value: str, ttl: int) -> None:
+        """Store an entry with a TTL in seconds."""
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+class LLMCache:
+    """Exact-match cache keyed on the full Claude request."""
+    
+    def __init__(self, backend: CacheBackend = None, ttl: int = 3600):
+        """
+        Initialize the cache.
+        
+        Args:
+            backend: Storage backend (defaults to an in-memory LRU)
+            ttl: Seconds a cached response stays valid
+        """
+        self.backend = backend or InMemoryLRU()
+        self.ttl = ttl
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+    
+    @staticmethod
+    def make_key(
+        model_id: str,
+        system: Optional[str],
+        messages: List[Dict[str, Any]],
+        max_tokens: int
+    ) -> str:
+        """Hash everything that determines the model's response."""
+        payload = json.dumps(
+            {"m": model_id, "sys": system, "msgs": messages, "mt": max_tokens},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response and record the hit/miss."""
+        value = self.backend.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+    
+    def set(self, key: str, value: str, ttl: int = None) -> None:
+        """Store a response."""
+        self.backend.set(key, value, ttl or self.ttl)
+    
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for async callers; network backends run in a worker thread."""
+        if getattr(self.backend, 'blocking', False):
+            return await asyncio.to_thread(self.get, key)
+        return self.get(key)
+    
+    async def aset(self, key: str, value: str, ttl: int = None) -> None:
+        """set() for async callers; network backends run in a worker thread."""
+        if getattr(self.backend, 'blocking', False):
+            await asyncio.to_thread(self.set, key, value, ttl)
+        else:
+            self.set(key, value, ttl)
+
+def cache_from_env() -> Optional[LLMCache]:
+    """
+    Build the response cache configured by environment variables.
+    
+    CLAUDE_CACHE_ENABLED turns caching on; CLAUDE_CACHE_REDIS_URL selects
+    the Redis backend instead of the in-memory LRU.
+    
+    Returns:
+        An LLMCache, or None when caching is disabled
+    """
+    if os.getenv('CLAUDE_CACHE_ENABLED', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    
+    redis_url = os.getenv('CLAUDE_CACHE_REDIS_URL')
+    backend = RedisBackend(redis_url) if redis_url else InMemoryLRU(
+        max_entries=int(os.getenv('CLAUDE_CACHE_MAX_ENTRIES', '1024'))
+    )
+    return LLMCache(backend, ttl=int(os.getenv('CLAUDE_CACHE_TTL', '3600')))
+
+_MISSING = object()
+
+# Embedding models are large, so one instance per model name is shared
+# by every tenant's SemanticCache in the process
+_MODELS: Dict[str, Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+def _get_model(model_name: str):
+    """Return the process-wide SentenceTransformer for a model name."""
+    with _MODELS_LOCK:
+        if model_name not in _MODELS:
+            from sentence_transformers import SentenceTransformer
+            _MODELS[model_name] = SentenceTransformer(model_name)
+        return _MODELS[model_name]
+
+def _atomic_write(path: str, write: Callable[[Any], None]) -> None:
+    """
+    Write via a temp file and rename, so readers never see a partial file.
+    
+    The temp file name is unique, so processes sharing the directory
+    (e.g. the server and a health check) can't clobber each other's writes.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path),
+        prefix=f".{os.path.basename(path)}.",
+        suffix='.tmp'
+    )
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class SemanticCache:
+    """
+    Near-duplicate prompt cache backed by sentence embeddings and FAISS.
+    
+    Entries are partitioned per (tenant, system prompt) so one tenant can
+    never be served another tenant's response, and expire after ttl
+    seconds like LLMCache entries.
+    """
+    
+    def __init__(
+        self,
+        tenant_id: str,
+        threshold: float = 0.92,
+        model_name: str = 'sentence-transformers/all-MiniLM-L6-v2',
+        cache_dir: str = None,
+        ttl: int = 3600
+    ):
+        """
+        Initialize the embedding model and per-tenant index directory.
+        
+        Args:
+            tenant_id: Tenant whose responses this cache holds
+            threshold: Minimum cosine similarity counted as a hit
+            model_name: sentence-transformers model used for embeddings
+            cache_dir: Root directory for persisted indexes
+            ttl: Seconds a cached response stays valid
+        """
+        import faiss
+        import numpy as np
+        
+        self._faiss = faiss
+        self._np = np
+        self.threshold = threshold
+        self.ttl = ttl
+        self.model = _get_model(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        
+        safe_tenant = re.sub(r'[^A-Za-z0-9_.-]', '_', tenant_id or 'default')
+        root = cache_dir or os.path.join('~', '.cache', 'butler')
+        self.tenant_dir = os.path.join(os.path.expanduser(root), safe_tenant)
+        
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+        # Result of the latest prefetch, keyed by (system, message)
+        self._prefetched: Dict[Tuple[Optional[str], str], Optional[str]] = {}
+        # namespace -> (index, [[response, expires_at], ...]) in index order
+        self._indexes: Dict[str, Tuple[Any, List[List[Any]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _path(self, namespace: str) -> str:
+        """
+        File holding a system prompt namespace's vectors and responses.
+        
+        Both live in one file so they are replaced together; separate
+        files could be read from different writes and misalign.
+        """
+        return os.path.join(self.tenant_dir, namespace, 'sem.npz')
+    
+    def _load(self, system: Optional[str]) -> Tuple[str, Any, List[List[Any]]]:
+        """Return the index and entries for a system prompt, loading from disk once."""
+        namespace = hashlib.sha256((system or '').encode()).hexdigest()[:16]
+        if namespace not in self._indexes:
+            index = self._faiss.IndexFlatIP(self.dimension)
+            entries = []
+            path = self._path(namespace)
+            if os.path.exists(path):
+                try:
+                    with self._np.load(path, allow_pickle=False) as data:
+                        vectors = data['vectors']
+                        entries = json.loads(str(data['entries']))
+                    if len(vectors) != len(entries):
+                        raise ValueError(
+                            f"{len(vectors)} vectors for {len(entries)} responses"
+                        )
+                    index.add(vectors)
+                except Exception as e:
+                    # Start over rather than serve misaligned responses
+                    logger.warning("Discarding semantic cache %s: %s", path, e)
+                    index = self._faiss.IndexFlatIP(self.dimension)
+                    entries = []
+            self._indexes[namespace] = self._prune(index, entries)
+        
+        index, entries = self._indexes[namespace]
+        return namespace, index, entries
+    
+    def _prune(self, index: Any, entries: List[List[Any]]) -> Tuple[Any, List[List[Any]]]:
+        """Rebuild the index without expired entries."""
+        now = time.time()
+        live = [i for i, (_, expires_at) in enumerate(entries) if expires_at > now]
+        if len(live) == len(entries):
+            return index, entries
+        
+        pruned = self._faiss.IndexFlatIP(self.dimension)
+        if live:
+            pruned.add(index.reconstruct_n(0, index.ntotal)[live])
+        return pruned, [entries[i] for i in live]
+    
+    def _embed(self, text: str):
+        """Embed text as a normalized float32 row so inner product is cosine."""
+        return self.model.encode(
+            [text],
+            normalize_embeddings=True
+        ).astype('float32')
+    
+    def _search(self, user_message: str, system: str = None) -> Optional[str]:
+        """Closest live cached response above threshold, without touching stats."""
+        vector = self._embed(user_message)
+        now = time.time()
+        with self._lock:
+            _, index, entries = self._load(system)
+            if index.ntotal:
+                # Look past the top hit in case it has expired
+                scores, ids = index.search(vector, min(index.ntotal, 5))
+                for score, i in zip(scores[0], ids[0]):
+                    if score < self.threshold:
+                        break
+                    response, expires_at = entries[i]
+                    if expires_at > now:
+                        return response
+            return None
+    
+    def get(self, user_message: str, system: str = None) -> Optional[str]:
+        """Return the cached response for the closest prompt above threshold."""
+        with self._lock:
+            prefetched = self._prefetched.pop((system, user_message), _MISSING)
+        
+        response = prefetched if prefetched is not _MISSING else self._search(
+            user_message, system
+        )
+        with self._lock:
+            self.stats["hits" if response is not None else "misses"] += 1
+        return response
+    
+    def prefetch(self, user_message: str, system: str = None) -> None:
+        """
+        Look up a message ahead of time, e.g. while it is being typed.
+        
+        If the same message is then passed to get(), the embedding and
+        search are already done. Only the latest prefetch is kept.
+        """
+        response = self._search(user_message, system)
+        with self._lock:
+            self._prefetched = {(system, user_message): response}
+    
+    def add(self, user_message: str, response: str, system: str = None) -> None:
+        """Store a response and persist the tenant's index."""
+        vector = self._embed(user_message)
+        with self._lock:
+            namespace, index, entries = self._load(system)
+            index, entries = self._prune(index, entries)
+            index.add(vector)
+            entries.append([response, time.time() + self.ttl])
+            self._indexes[namespace] = (index, entries)
+            self._prefetched.clear()
+            
+            path = self._path(namespace)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            vectors = index.reconstruct_n(0, index.ntotal)
+            _atomic_write(
+                path,
+                lambda f: self._np.savez(
+                    f, vectors=vectors, entries=self._np.array(json.dumps(entries))
+                )
+            )
+
+def semantic_cache_from_env(tenant_id: str = None) -> Optional[SemanticCache]:
+    """
+    Build the semantic cache configured by environment variables.
+    
+    CLAUDE_SEMANTIC_CACHE_ENABLED turns it on (requires faiss-cpu and
+    sentence-transformers); CLAUDE_SEMANTIC_CACHE_THRESHOLD tunes the
+    similarity cut-off and CLAUDE_SEMANTIC_CACHE_TTL the entry lifetime.
+    
+    Returns:
+        A SemanticCache, or None when disabled
+    """
+    if os.getenv('CLAUDE_SEMANTIC_CACHE_ENABLED', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    
+    return SemanticCache(
+        tenant_id,
+        threshold=float(os.getenv('CLAUDE_SEMANTIC_CACHE_THRESHOLD', '0.92')),
+        cache_dir=os.getenv('CLAUDE_SEMANTIC_CACHE_DIR'),
+        ttl=int(os.getenv('CLAUDE_SEMANTIC_CACHE_TTL', '3600'))
+    )